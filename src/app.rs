@@ -29,9 +29,11 @@ impl EmailAssassinApp {
                 BackgroundEvent::ScanComplete {
                     senders,
                     total_emails,
+                    sender_uids,
                 } => {
                     self.state.senders = senders;
                     self.state.total_emails = total_emails;
+                    self.state.sender_uids = sender_uids;
                     self.state.phase = AppPhase::ScanComplete;
                     self.state.scan_progress = 1.0;
                     self.state.scan_status = "Complete".to_string();
@@ -54,7 +56,11 @@ impl EmailAssassinApp {
                         .retain(|s| !removed_senders.contains(&s.email));
                     for sender in &removed_senders {
                         self.state.sender_selected.remove(sender);
+                        self.state.sender_uids.remove(sender);
                     }
+                    // Selection entries changed wholesale; re-derive the
+                    // running total rather than patching it per sender.
+                    self.state.selected_emails = self.state.selected_email_count();
                     self.state.phase = AppPhase::ScanComplete;
                     self.state.delete_progress = 1.0;
                     self.state.delete_status =
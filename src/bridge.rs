@@ -1,5 +1,6 @@
 use crate::imap::{deleter, scanner};
 use crate::state::{DeleteMode, SenderInfo};
+use std::collections::HashMap;
 use std::sync::mpsc as std_mpsc;
 use tokio::sync::mpsc as tokio_mpsc;
 
@@ -17,6 +18,9 @@ pub enum UiCommand {
         folder: String,
         senders: Vec<String>,
         mode: DeleteMode,
+        /// UIDs recorded during the scan for the selected senders. When
+        /// present, deletion skips the server-side SEARCH entirely.
+        cached_uids: Option<Vec<u32>>,
     },
 }
 
@@ -29,6 +33,7 @@ pub enum BackgroundEvent {
     ScanComplete {
         senders: Vec<SenderInfo>,
         total_emails: usize,
+        sender_uids: HashMap<String, Vec<u32>>,
     },
     ScanError(String),
     DeleteProgress {
@@ -64,6 +69,12 @@ async fn background_loop(
     event_tx: std_mpsc::Sender<BackgroundEvent>,
     ctx: egui::Context,
 ) {
+    // The delete connection outlives individual EXECUTE presses, so a
+    // second purge against the same folder skips TLS + LOGIN + SELECT.
+    // Deletes run inline here (the UI blocks further commands while one
+    // is in flight anyway), which keeps the session owned by the loop.
+    let mut delete_session: Option<deleter::DeleteSession> = None;
+
     while let Some(cmd) = cmd_rx.recv().await {
         match cmd {
             UiCommand::StartScan {
@@ -84,12 +95,19 @@ async fn background_loop(
                 folder,
                 senders,
                 mode,
+                cached_uids,
             } => {
-                let tx = event_tx.clone();
-                let ctx2 = ctx.clone();
-                tokio::spawn(async move {
-                    handle_delete(email, password, folder, senders, mode, tx, ctx2).await;
-                });
+                let mut session = match delete_session.take() {
+                    Some(session) if session.matches(&email, &password, &folder) => session,
+                    stale => {
+                        if let Some(mut stale) = stale {
+                            stale.logout().await;
+                        }
+                        deleter::DeleteSession::new(email, password, folder)
+                    }
+                };
+                handle_delete(&mut session, senders, mode, cached_uids, &event_tx, &ctx).await;
+                delete_session = Some(session);
             }
         }
     }
@@ -115,20 +133,14 @@ async fn handle_scan(
         status: "Fetching message IDs...".to_string(),
     });
 
-    let all_uids = match scanner::fetch_all_uids(&email, &password, &folder).await {
-        Ok(uids) => uids,
-        Err(e) => {
-            send(BackgroundEvent::ScanError(e.to_string()));
-            return;
-        }
-    };
-
-    let total_emails = all_uids.len();
-    let uids_to_scan = if scan_depth > 0 && (scan_depth as usize) < total_emails {
-        all_uids[total_emails - scan_depth as usize..].to_vec()
-    } else {
-        all_uids
-    };
+    let (uids_to_scan, total_emails, session) =
+        match scanner::fetch_all_uids(&email, &password, &folder, scan_depth).await {
+            Ok(result) => result,
+            Err(e) => {
+                send(BackgroundEvent::ScanError(e.to_string()));
+                return;
+            }
+        };
 
     send(BackgroundEvent::ScanProgress {
         progress: 0.05,
@@ -150,11 +162,12 @@ async fn handle_scan(
         }
     };
 
-    match scanner::run_scan(&email, &password, &folder, uids_to_scan, progress_cb).await {
-        Ok(senders) => {
+    match scanner::run_scan(&email, &password, &folder, uids_to_scan, Some(session), progress_cb).await {
+        Ok((senders, sender_uids)) => {
             send(BackgroundEvent::ScanComplete {
                 senders,
                 total_emails,
+                sender_uids,
             });
         }
         Err(e) => {
@@ -164,13 +177,12 @@ async fn handle_scan(
 }
 
 async fn handle_delete(
-    email: String,
-    password: String,
-    folder: String,
+    session: &mut deleter::DeleteSession,
     senders: Vec<String>,
     mode: DeleteMode,
-    tx: std_mpsc::Sender<BackgroundEvent>,
-    ctx: egui::Context,
+    cached_uids: Option<Vec<u32>>,
+    tx: &std_mpsc::Sender<BackgroundEvent>,
+    ctx: &egui::Context,
 ) {
     let send = |evt: BackgroundEvent| {
         if let Err(e) = tx.send(evt) {
@@ -180,38 +192,39 @@ async fn handle_delete(
     };
 
     let total = senders.len();
-    let mut total_removed = 0usize;
-    let mut removed_senders = Vec::new();
     let use_trash = mode == DeleteMode::Trash;
 
-    for (i, sender) in senders.iter().enumerate() {
-        send(BackgroundEvent::DeleteProgress {
-            progress: i as f32 / total as f32,
-            status: format!("Purging {sender}..."),
-        });
-
-        match deleter::nuke_sender(&email, &password, &folder, sender, use_trash).await {
-            Ok(count) => {
-                total_removed += count;
-                removed_senders.push(sender.clone());
-                tracing::info!(count, sender_index = i, "emails removed from sender");
-            }
-            Err(e) => {
-                tracing::error!(sender_index = i, error = %e, "failed to delete emails from sender");
-                send(BackgroundEvent::DeleteError(format!(
-                    "Failed to purge {sender}: {e}"
-                )));
-            }
-        }
+    send(BackgroundEvent::DeleteProgress {
+        progress: 0.0,
+        status: format!("Purging {total} senders..."),
+    });
 
-        send(BackgroundEvent::DeleteProgress {
-            progress: (i + 1) as f32 / total as f32,
-            status: format!("Completed {}/{}", i + 1, total),
-        });
-    }
+    // With scan-cached UIDs the purge goes straight to the batched
+    // MOVE/STORE; otherwise one OR-tree SEARCH on the (possibly reused)
+    // session covers every selected sender.
+    let result = if let Some(uids) = cached_uids {
+        session.nuke_uids(uids, use_trash).await
+    } else {
+        session.nuke_senders(&senders, use_trash).await
+    };
 
-    send(BackgroundEvent::DeleteComplete {
-        removed_senders,
-        total_removed,
-    });
+    match result {
+        Ok(total_removed) => {
+            tracing::info!(total_removed, senders = total, "emails removed");
+            send(BackgroundEvent::DeleteComplete {
+                removed_senders: senders,
+                total_removed,
+            });
+        }
+        Err(e) => {
+            tracing::error!(error = %e, "failed to delete emails");
+            send(BackgroundEvent::DeleteError(format!(
+                "Failed to purge senders: {e}"
+            )));
+            send(BackgroundEvent::DeleteComplete {
+                removed_senders: Vec::new(),
+                total_removed: 0,
+            });
+        }
+    }
 }
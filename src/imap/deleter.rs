@@ -1,48 +1,237 @@
 use crate::error::AppError;
 use crate::imap::provider::ImapProvider;
+use crate::imap::sequence::build_sequence_sets;
 use futures::StreamExt;
 
-use super::connect_imap;
+use super::{connect_imap, ImapSession};
 
-/// Maximum UIDs per IMAP command. Keeps individual commands under typical
-/// server command-length limits and avoids long-running single operations.
-const DELETE_CHUNK_SIZE: usize = 1000;
+/// Soft cap on the rendered length of one SEARCH query — the same
+/// ~1000-octet command-line budget (RFC 2683) that `build_sequence_sets`
+/// honors, with headroom for the `UID SEARCH` verb. An unbounded OR
+/// tree blows past it at roughly 25 selected senders, and strict
+/// servers reject the whole command with BAD.
+const MAX_QUERY_LEN: usize = 900;
 
-pub async fn nuke_sender(
-    email: &str,
-    password: &str,
-    folder: &str,
-    sender: &str,
-    use_trash: bool,
-) -> Result<usize, AppError> {
-    let mut session = connect_imap(email, password, folder).await?;
-    let provider = ImapProvider::from_email(email);
-
-    // Sanitize sender to prevent malformed IMAP search queries
-    let sanitized_sender = sender.replace('"', "");
-    let search_query = format!("FROM \"{sanitized_sender}\"");
-    let uids = session
-        .uid_search(&search_query)
-        .await
-        .map_err(|e| AppError::Imap(e.to_string()))?;
-
-    let uid_vec: Vec<u32> = uids.into_iter().collect();
-    let total = uid_vec.len();
-
-    if total == 0 {
-        if let Err(e) = session.logout().await {
-            tracing::warn!(error = %e, "logout failed after empty search");
+/// Builds a balanced IMAP OR tree matching mail from any of `senders`,
+/// e.g. `OR OR FROM "a" FROM "b" FROM "c"`. IMAP's OR is strictly
+/// binary, so N terms need N-1 OR prefixes; pairing level by level
+/// keeps the nesting depth logarithmic.
+fn build_from_query(senders: &[String]) -> String {
+    let mut terms: Vec<String> = senders
+        .iter()
+        // Sanitize senders to prevent malformed IMAP search queries
+        .map(|s| format!("FROM \"{}\"", s.replace('"', "")))
+        .collect();
+
+    while terms.len() > 1 {
+        let mut next = Vec::with_capacity(terms.len().div_ceil(2));
+        for pair in terms.chunks(2) {
+            match pair {
+                [a, b] => next.push(format!("OR {a} {b}")),
+                [a] => next.push(a.clone()),
+                _ => unreachable!(),
+            }
         }
-        return Ok(0);
+        terms = next;
     }
 
-    for chunk in uid_vec.chunks(DELETE_CHUNK_SIZE) {
-        let uid_str = chunk
-            .iter()
-            .map(std::string::ToString::to_string)
-            .collect::<Vec<_>>()
-            .join(",");
+    terms.pop().unwrap_or_default()
+}
+
+/// Splits `senders` into groups whose rendered OR tree stays under
+/// [`MAX_QUERY_LEN`] and builds one query per group — still one round
+/// trip per ~25 senders rather than one per sender, but a mass
+/// selection from the kill list can never exceed the line limit.
+fn build_from_queries(senders: &[String]) -> Vec<String> {
+    let mut queries = Vec::new();
+    let mut start = 0;
+    let mut group_len = 0usize;
+
+    for (i, sender) in senders.iter().enumerate() {
+        // `FROM "addr"` plus the `OR ` prefix and space joining it in.
+        let term_len = sender.len() + 7 + 4;
+        if i > start && group_len + term_len > MAX_QUERY_LEN {
+            queries.push(build_from_query(&senders[start..i]));
+            start = i;
+            group_len = 0;
+        }
+        group_len += term_len;
+    }
+
+    if start < senders.len() {
+        queries.push(build_from_query(&senders[start..]));
+    }
+    queries
+}
+
+/// A reusable delete connection bound to one account and folder.
+///
+/// The authenticated session (and the provider/trash-folder lookup)
+/// persists across EXECUTE presses, so repeated purges skip the TLS,
+/// LOGIN and SELECT round trips — on high-latency servers that setup
+/// can cost more than the purge itself. A session the server has since
+/// dropped is reopened transparently and the purge retried once.
+pub struct DeleteSession {
+    email: String,
+    password: String,
+    folder: String,
+    provider: ImapProvider,
+    session: Option<ImapSession>,
+}
+
+impl std::fmt::Debug for DeleteSession {
+    fn fmt(&self, f: &mut std::fmt::Formatter<'_>) -> std::fmt::Result {
+        f.debug_struct("DeleteSession")
+            .field("email", &self.email)
+            .field("folder", &self.folder)
+            .field("connected", &self.session.is_some())
+            .finish_non_exhaustive()
+    }
+}
+
+impl DeleteSession {
+    pub fn new(email: String, password: String, folder: String) -> Self {
+        let provider = ImapProvider::from_email(&email);
+        Self {
+            email,
+            password,
+            folder,
+            provider,
+            session: None,
+        }
+    }
+
+    /// Whether this session is bound to the given credentials and folder.
+    pub fn matches(&self, email: &str, password: &str, folder: &str) -> bool {
+        self.email == email && self.password == password && self.folder == folder
+    }
+
+    async fn ensure_connected(&mut self) -> Result<(), AppError> {
+        if self.session.is_some() {
+            return Ok(());
+        }
+        let (session, _mailbox) = connect_imap(&self.email, &self.password, &self.folder).await?;
+        self.session = Some(session);
+        Ok(())
+    }
+
+    /// Removes every message from any of `senders` in the bound folder.
+    ///
+    /// UIDs come from server-side `UID SEARCH` commands with an OR tree
+    /// over ~25 senders each — no headers are downloaded and no
+    /// per-sender round trips — and are then moved (or flagged) in
+    /// batched UID commands, with at most one EXPUNGE at the end.
+    pub async fn nuke_senders(
+        &mut self,
+        senders: &[String],
+        use_trash: bool,
+    ) -> Result<usize, AppError> {
+        if senders.is_empty() {
+            return Ok(0);
+        }
+
+        let had_cached = self.session.is_some();
+        match self.nuke_senders_inner(senders, use_trash).await {
+            Err(e) if had_cached => {
+                tracing::warn!(error = %e, "cached delete session failed, reconnecting");
+                self.session = None;
+                self.nuke_senders_inner(senders, use_trash).await
+            }
+            result => result,
+        }
+    }
+
+    async fn nuke_senders_inner(
+        &mut self,
+        senders: &[String],
+        use_trash: bool,
+    ) -> Result<usize, AppError> {
+        self.ensure_connected().await?;
+        let mut session = self.session.take().unwrap();
 
+        let mut uid_vec: Vec<u32> = Vec::new();
+        for search_query in build_from_queries(senders) {
+            let uids = match session.uid_search(&search_query).await {
+                Ok(uids) => uids,
+                Err(e) => return Err(AppError::Imap(e.to_string())),
+            };
+            uid_vec.extend(uids);
+        }
+
+        // FROM matches substrings, so a message can satisfy queries
+        // from more than one group — dedup before purging.
+        uid_vec.sort_unstable();
+        uid_vec.dedup();
+        let total = uid_vec.len();
+
+        if total == 0 {
+            self.session = Some(session);
+            return Ok(0);
+        }
+
+        purge_uids(&mut session, &self.provider, &uid_vec, use_trash).await?;
+
+        self.session = Some(session);
+        Ok(total)
+    }
+
+    /// Removes messages by UID without any server-side search — used
+    /// when a scan has already recorded exactly which UIDs belong to
+    /// the selected senders, saving the SEARCH round trip per purge.
+    pub async fn nuke_uids(
+        &mut self,
+        mut uids: Vec<u32>,
+        use_trash: bool,
+    ) -> Result<usize, AppError> {
+        if uids.is_empty() {
+            return Ok(0);
+        }
+        uids.sort_unstable();
+        uids.dedup();
+
+        let had_cached = self.session.is_some();
+        match self.nuke_uids_inner(&uids, use_trash).await {
+            Err(e) if had_cached => {
+                tracing::warn!(error = %e, "cached delete session failed, reconnecting");
+                self.session = None;
+                self.nuke_uids_inner(&uids, use_trash).await
+            }
+            result => result,
+        }
+    }
+
+    async fn nuke_uids_inner(&mut self, uids: &[u32], use_trash: bool) -> Result<usize, AppError> {
+        self.ensure_connected().await?;
+        let mut session = self.session.take().unwrap();
+
+        purge_uids(&mut session, &self.provider, uids, use_trash).await?;
+
+        self.session = Some(session);
+        Ok(uids.len())
+    }
+
+    /// Logs out the cached session, if any.
+    pub async fn logout(&mut self) {
+        if let Some(mut session) = self.session.take() {
+            if let Err(e) = session.logout().await {
+                tracing::warn!(error = %e, "logout failed for delete session");
+            }
+        }
+    }
+}
+
+/// Moves (or flags and expunges) the given sorted UIDs on an
+/// already-selected mailbox.
+async fn purge_uids(
+    session: &mut ImapSession,
+    provider: &ImapProvider,
+    uid_vec: &[u32],
+    use_trash: bool,
+) -> Result<(), AppError> {
+    // Range-compressed sequence sets: contiguous UID runs collapse to
+    // `a:b`, so a mostly-contiguous purge needs a handful of commands
+    // instead of one per 1000 comma-joined UIDs.
+    for uid_str in build_sequence_sets(uid_vec) {
         if use_trash {
             session
                 .uid_mv(&uid_str, provider.trash_folder)
@@ -55,18 +244,19 @@ pub async fn nuke_sender(
                 .map_err(|e| AppError::Imap(e.to_string()))?
                 .collect::<Vec<_>>()
                 .await;
-
-            session
-                .expunge()
-                .await
-                .map_err(|e| AppError::Imap(e.to_string()))?
-                .collect::<Vec<_>>()
-                .await;
         }
     }
 
-    if let Err(e) = session.logout().await {
-        tracing::warn!(error = %e, "logout failed after deletion");
+    // One EXPUNGE for the whole purge rather than one per chunk — the
+    // flags are already set, so a single round trip suffices.
+    if !use_trash {
+        session
+            .expunge()
+            .await
+            .map_err(|e| AppError::Imap(e.to_string()))?
+            .collect::<Vec<_>>()
+            .await;
     }
-    Ok(total)
+
+    Ok(())
 }
@@ -1,6 +1,7 @@
 pub mod deleter;
 pub mod provider;
 pub mod scanner;
+pub mod sequence;
 
 use crate::error::AppError;
 use provider::ImapProvider;
@@ -10,12 +11,17 @@ use std::time::Duration;
 /// while still failing fast on unreachable hosts.
 const CONNECT_TIMEOUT: Duration = Duration::from_secs(30);
 
+/// An authenticated IMAP session with a mailbox selected.
+pub type ImapSession = async_imap::Session<async_native_tls::TlsStream<async_std::net::TcpStream>>;
+
+/// Connects, authenticates and selects `folder`, returning the session
+/// together with the SELECT response (whose EXISTS count callers use to
+/// size depth-limited scans without a full UID listing).
 pub async fn connect_imap(
     email: &str,
     password: &str,
     folder: &str,
-) -> Result<async_imap::Session<async_native_tls::TlsStream<async_std::net::TcpStream>>, AppError>
-{
+) -> Result<(ImapSession, async_imap::types::Mailbox), AppError> {
     let provider = ImapProvider::from_email(email);
     let tls = async_native_tls::TlsConnector::new();
     let tcp = async_std::future::timeout(
@@ -37,10 +43,10 @@ pub async fn connect_imap(
         .await
         .map_err(|(e, _)| AppError::Auth(e.to_string()))?;
 
-    session
+    let mailbox = session
         .select(folder)
         .await
         .map_err(|e| AppError::Imap(e.to_string()))?;
 
-    Ok(session)
+    Ok((session, mailbox))
 }
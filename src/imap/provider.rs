@@ -5,40 +5,48 @@ pub struct ImapProvider {
     pub trash_folder: &'static str,
 }
 
+/// Domain substrings mapped to their provider settings. First match
+/// wins; anything unrecognized falls back to Gmail.
+const PROVIDER_TABLE: &[(&[&str], ImapProvider)] = &[
+    (
+        &["outlook", "hotmail", "live.com"],
+        ImapProvider {
+            host: "imap-mail.outlook.com",
+            port: 993,
+            trash_folder: "Deleted",
+        },
+    ),
+    (
+        &["yahoo"],
+        ImapProvider {
+            host: "imap.mail.yahoo.com",
+            port: 993,
+            trash_folder: "Trash",
+        },
+    ),
+    (
+        &["icloud", "me.com", "mac.com"],
+        ImapProvider {
+            host: "imap.mail.me.com",
+            port: 993,
+            trash_folder: "Deleted Messages",
+        },
+    ),
+];
+
+const DEFAULT_PROVIDER: ImapProvider = ImapProvider {
+    host: "imap.gmail.com",
+    port: 993,
+    trash_folder: "[Gmail]/Trash",
+};
+
 impl ImapProvider {
     pub fn from_email(email: &str) -> Self {
-        let domain = email
-            .rsplit('@')
-            .next()
-            .unwrap_or("")
-            .to_lowercase();
+        let domain = email.rsplit('@').next().unwrap_or("").to_lowercase();
 
-        if domain.contains("outlook") || domain.contains("hotmail") || domain.contains("live.com")
-        {
-            Self {
-                host: "imap-mail.outlook.com",
-                port: 993,
-                trash_folder: "Deleted",
-            }
-        } else if domain.contains("yahoo") {
-            Self {
-                host: "imap.mail.yahoo.com",
-                port: 993,
-                trash_folder: "Trash",
-            }
-        } else if domain.contains("icloud") || domain.contains("me.com") || domain.contains("mac.com") {
-            Self {
-                host: "imap.mail.me.com",
-                port: 993,
-                trash_folder: "Deleted Messages",
-            }
-        } else {
-            // Default: Gmail
-            Self {
-                host: "imap.gmail.com",
-                port: 993,
-                trash_folder: "[Gmail]/Trash",
-            }
-        }
+        PROVIDER_TABLE
+            .iter()
+            .find(|(keys, _)| keys.iter().any(|k| domain.contains(k)))
+            .map_or(DEFAULT_PROVIDER, |(_, provider)| provider.clone())
     }
 }
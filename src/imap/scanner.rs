@@ -1,77 +1,98 @@
 use crate::error::AppError;
 use crate::state::SenderInfo;
 use futures::StreamExt;
-use regex::Regex;
 use std::collections::HashMap;
-use std::sync::LazyLock;
 use tokio::sync::mpsc;
 
 use super::connect_imap;
-
-static FROM_RE: LazyLock<Regex> =
-    LazyLock::new(|| Regex::new(r"(?i)From:\s*(.*)").unwrap());
-static EMAIL_RE: LazyLock<Regex> =
-    LazyLock::new(|| Regex::new(r"<([^>]+)>").unwrap());
+use super::sequence::build_sequence_sets;
 
 /// Number of persistent IMAP connections used for parallel scanning.
 /// Balances throughput against server-side connection limits (most
 /// providers allow 10-15 simultaneous sessions).
 const MAX_CONCURRENT: usize = 10;
 
+/// Jobs queued per connection. Each worker pulls sub-ranges from the
+/// shared queue, so a connection issues its next FETCH as soon as the
+/// previous response drains instead of idling between mega-chunks, and
+/// one slow sub-range no longer stalls a tenth of the mailbox.
+const JOBS_PER_CONNECTION: usize = 8;
+
+/// Maximum UIDs per FETCH command. Batches beyond ~100 UIDs give no
+/// measurable extra throughput, while oversize UID lists make stricter
+/// servers reject the command with "BAD parse error: maximum request
+/// size exceeded".
+const FETCH_BATCH_SIZE: usize = 100;
+
 /// Initial progress percentage reserved for the UID-fetch phase before
 /// batch scanning begins.
 const INITIAL_PROGRESS: f32 = 0.05;
 
-fn parse_sender(raw: &[u8]) -> String {
-    let text = String::from_utf8_lossy(raw);
-    if let Some(m) = FROM_RE.captures(&text) {
-        let raw_from = m.get(1).map_or("", |m| m.as_str().trim());
-        if let Some(email_match) = EMAIL_RE.captures(raw_from) {
-            return email_match
-                .get(1).map_or_else(|| "unknown".to_string(), |m| m.as_str().to_lowercase());
-        }
-        if !raw_from.is_empty() {
-            return raw_from.to_lowercase();
-        }
-    }
-    "unknown".to_string()
-}
-
+/// One streamed scan update: how many messages the sub-fetch covered,
+/// plus the raw senders (and their UIDs) observed in it.
+type ScanUpdate = (usize, HashMap<Vec<u8>, Vec<u32>>);
+
+/// Lists the UIDs to scan, newest-last, plus the total message count in
+/// the folder and the still-authenticated session (handed to the first
+/// scan worker so its TLS handshake and LOGIN aren't paid twice).
+///
+/// When `scan_depth` limits the scan to the tail of the mailbox, the
+/// SELECT response's EXISTS count lets us fetch UIDs for just that
+/// sequence range — servers don't advertise a cheap partitioned UID
+/// listing (the UIDBATCHES draft is not in async-imap), but this avoids
+/// the megabyte-sized `UID SEARCH ALL` response on large mailboxes all
+/// the same.
 pub async fn fetch_all_uids(
     email: &str,
     password: &str,
     folder: &str,
-) -> Result<Vec<u32>, AppError> {
-    let mut session = connect_imap(email, password, folder).await?;
-
-    let uids = session
-        .uid_search("ALL")
-        .await
-        .map_err(|e| AppError::Imap(e.to_string()))?;
-
-    if let Err(e) = session.logout().await {
-        tracing::warn!(error = %e, "logout failed after UID fetch");
-    }
+    scan_depth: u32,
+) -> Result<(Vec<u32>, usize, super::ImapSession), AppError> {
+    let (mut session, mailbox) = connect_imap(email, password, folder).await?;
+    let total = mailbox.exists as usize;
+
+    let mut uid_vec: Vec<u32> = if scan_depth > 0 && mailbox.exists > scan_depth {
+        let start = mailbox.exists - scan_depth + 1;
+        let fetches = session
+            .fetch(format!("{start}:*"), "(UID)")
+            .await
+            .map_err(|e| AppError::Imap(e.to_string()))?;
+        let uids: Vec<u32> = fetches
+            .filter_map(|f| async move { f.ok().and_then(|f| f.uid) })
+            .collect()
+            .await;
+        uids
+    } else {
+        let uids = session
+            .uid_search("ALL")
+            .await
+            .map_err(|e| AppError::Imap(e.to_string()))?;
+        uids.into_iter().collect()
+    };
 
-    let mut uid_vec: Vec<u32> = uids.into_iter().collect();
     uid_vec.sort_unstable();
-    Ok(uid_vec)
+    Ok((uid_vec, total, session))
 }
 
 struct ScanWorker {
     email: String,
     password: String,
     folder: String,
-    session: Option<async_imap::Session<async_native_tls::TlsStream<async_std::net::TcpStream>>>,
+    session: Option<super::ImapSession>,
 }
 
 impl ScanWorker {
-    fn new(email: String, password: String, folder: String) -> Self {
+    fn new(
+        email: String,
+        password: String,
+        folder: String,
+        session: Option<super::ImapSession>,
+    ) -> Self {
         Self {
             email,
             password,
             folder,
-            session: None,
+            session,
         }
     }
 
@@ -79,54 +100,104 @@ impl ScanWorker {
         if self.session.is_some() {
             return Ok(());
         }
-        let session = connect_imap(&self.email, &self.password, &self.folder).await?;
+        let (session, _mailbox) = connect_imap(&self.email, &self.password, &self.folder).await?;
         self.session = Some(session);
         Ok(())
     }
 
-    async fn scan_batch(&mut self, uids: &[u32]) -> Result<Vec<String>, AppError> {
+    /// Scans one job's UIDs, streaming a `(messages covered, senders)`
+    /// update per sub-fetch rather than accumulating the whole job in
+    /// memory — peak footprint per worker is one sub-batch regardless of
+    /// job size.
+    ///
+    /// Sub-batch maps are keyed on raw "mailbox@host" bytes; case
+    /// normalization still happens once per unique sender at the
+    /// aggregation point. ENVELOPE hands the address back pre-split by
+    /// the server (and often pre-cached there), so there is no header
+    /// text to download or parse at all — the scratch buffer keeps
+    /// repeat senders allocation-free. Retaining the UID of every
+    /// message lets a later delete skip the server-side SEARCH for
+    /// senders this scan already covered.
+    ///
+    /// Every UID is reported covered exactly once, including on failure,
+    /// so aggregate progress always completes.
+    async fn scan_batch(
+        &mut self,
+        uids: &[u32],
+        results: &mpsc::Sender<ScanUpdate>,
+    ) -> Result<(), AppError> {
         if uids.is_empty() {
-            return Ok(Vec::new());
+            return Ok(());
         }
 
-        self.ensure_connected().await?;
-        let mut session = self.session.take().unwrap();
-
-        let uid_str = uids
-            .iter()
-            .map(std::string::ToString::to_string)
-            .collect::<Vec<_>>()
-            .join(",");
-
-        let fetches_result = session
-            .uid_fetch(&uid_str, "BODY.PEEK[HEADER.FIELDS (FROM)]")
-            .await;
-
-        if let Err(e) = fetches_result {
-            tracing::warn!(error = %e, "IMAP fetch failed, dropping session");
-            return Err(AppError::Imap(e.to_string()));
+        if let Err(e) = self.ensure_connected().await {
+            if let Err(se) = results.send((uids.len(), HashMap::new())).await {
+                tracing::error!(error = %se, "failed to send scan fallback");
+            }
+            return Err(e);
         }
+        let mut session = self.session.take().unwrap();
+        let mut scratch: Vec<u8> = Vec::new();
+        let mut done = 0usize;
+
+        for sub in uids.chunks(FETCH_BATCH_SIZE) {
+            let mut senders: HashMap<Vec<u8>, Vec<u32>> = HashMap::new();
+
+            // Worker jobs are contiguous slices of the sorted UID list,
+            // so a sub-batch almost always compresses to a single `a:b`
+            // range — a few bytes on the wire instead of ~700 of
+            // comma-joined UIDs, and trivially parsed server-side.
+            for uid_str in build_sequence_sets(sub) {
+                let fetches_result = session.uid_fetch(&uid_str, "(ENVELOPE)").await;
+
+                if let Err(e) = fetches_result {
+                    tracing::warn!(error = %e, "IMAP fetch failed, dropping session");
+                    if let Err(se) = results.send((uids.len() - done, HashMap::new())).await {
+                        tracing::error!(error = %se, "failed to send scan fallback");
+                    }
+                    return Err(AppError::Imap(e.to_string()));
+                }
 
-        let mut stream = fetches_result.unwrap();
-        let mut senders = Vec::new();
-
-        while let Some(fetch_result) = stream.next().await {
-            if let Ok(fetch) = fetch_result {
-                if let Some(body) = fetch.header() {
-                    let sender = parse_sender(body);
-                    if sender != "unknown" {
-                        senders.push(sender);
+                let mut stream = fetches_result.unwrap();
+                while let Some(fetch_result) = stream.next().await {
+                    let Ok(fetch) = fetch_result else { continue };
+                    let Some(uid) = fetch.uid else { continue };
+                    let Some(addr) = fetch
+                        .envelope()
+                        .and_then(|e| e.from.as_deref())
+                        .and_then(<[_]>::first)
+                    else {
+                        continue;
+                    };
+                    let (Some(mailbox), Some(host)) = (&addr.mailbox, &addr.host) else {
+                        continue;
+                    };
+
+                    scratch.clear();
+                    scratch.extend_from_slice(mailbox);
+                    scratch.push(b'@');
+                    scratch.extend_from_slice(host);
+
+                    if let Some(sender_uids) = senders.get_mut(scratch.as_slice()) {
+                        sender_uids.push(uid);
+                    } else {
+                        senders.insert(scratch.clone(), vec![uid]);
                     }
                 }
+
+                // Explicitly drop the stream to release the borrow on session
+                drop(stream);
             }
-        }
 
-        // Explicitly drop the stream to release the borrow on session
-        drop(stream);
+            done += sub.len();
+            if let Err(e) = results.send((sub.len(), senders)).await {
+                tracing::error!(error = %e, "failed to send scan result");
+            }
+        }
 
         // Success — return the session to the worker for reuse
         self.session = Some(session);
-        Ok(senders)
+        Ok(())
     }
 }
 
@@ -135,17 +206,27 @@ pub async fn run_scan<F>(
     password: &str,
     folder: &str,
     uids: Vec<u32>,
+    session: Option<super::ImapSession>,
     progress_cb: F,
-) -> Result<Vec<SenderInfo>, AppError>
+) -> Result<(Vec<SenderInfo>, HashMap<String, Vec<u32>>), AppError>
 where
     F: Fn(f32, String) + Send + Sync + 'static,
 {
+    let mut session = session;
     let total = uids.len();
     if total == 0 {
-        return Ok(Vec::new());
+        if let Some(mut s) = session.take() {
+            if let Err(e) = s.logout().await {
+                tracing::warn!(error = %e, "logout failed after empty scan");
+            }
+        }
+        return Ok((Vec::new(), HashMap::new()));
     }
 
-    let chunk_size = (total / MAX_CONCURRENT).max(1);
+    // A job is never smaller than one full sub-batch; below that the
+    // job count, not FETCH_BATCH_SIZE, would dictate how many FETCH
+    // round trips a small scan pays.
+    let chunk_size = (total / (MAX_CONCURRENT * JOBS_PER_CONNECTION)).max(FETCH_BATCH_SIZE);
     let chunks: Vec<Vec<u32>> = uids.chunks(chunk_size).map(<[u32]>::to_vec).collect();
     let num_chunks = chunks.len();
 
@@ -159,30 +240,31 @@ where
     }
     job_tx.close();
 
+    // Never open more connections than there are jobs to run — a
+    // shallow scan of a few hundred messages doesn't need ten TLS
+    // handshakes.
+    let num_workers = MAX_CONCURRENT.min(num_chunks);
+
     let mut handles = Vec::new();
-    for worker_id in 0..MAX_CONCURRENT {
+    for worker_id in 0..num_workers {
         let job_rx = job_rx.clone();
         let result_tx = result_tx.clone();
         let email = email.to_string();
         let password = password.to_string();
         let folder = folder.to_string();
 
+        // The connection used for the UID listing is still authenticated
+        // and selected — seed the first worker with it rather than
+        // paying TLS + LOGIN + SELECT again.
+        let seed_session = session.take();
+
         handles.push(tokio::spawn(async move {
-            let mut worker = ScanWorker::new(email, password, folder);
+            let mut worker = ScanWorker::new(email, password, folder, seed_session);
             while let Ok(chunk) = job_rx.recv().await {
-                match worker.scan_batch(&chunk).await {
-                    Ok(senders) => {
-                        if let Err(e) = result_tx.send(senders).await {
-                            tracing::error!(worker = worker_id, error = %e, "failed to send scan result");
-                        }
-                    }
-                    Err(e) => {
-                        tracing::error!(worker = worker_id, error = %e, "batch scan failed");
-                        // Send empty result to keep progress moving
-                        if let Err(e) = result_tx.send(Vec::new()).await {
-                            tracing::error!(worker = worker_id, error = %e, "failed to send error fallback");
-                        }
-                    }
+                // scan_batch streams its own results (and failure
+                // fallbacks) through result_tx as sub-fetches complete.
+                if let Err(e) = worker.scan_batch(&chunk, &result_tx).await {
+                    tracing::error!(worker = worker_id, error = %e, "batch scan failed");
                 }
             }
             if let Some(mut session) = worker.session {
@@ -195,24 +277,43 @@ where
 
     drop(result_tx);
 
-    let mut sender_map = HashMap::new();
-    let mut completed_batches = 0;
-
-    while let Some(senders) = result_rx.recv().await {
-        for s in senders {
-            *sender_map.entry(s).or_insert(0) += 1;
+    // Merge per-sub-fetch maps as they stream in; normalization is
+    // deferred to one pass over the (much smaller) set of unique
+    // senders below. Workers hand over one small map per sub-fetch
+    // rather than one payload per whole job, so no worker ever holds
+    // more than a sub-batch of results; the retained UIDs feed the
+    // scanned-only delete path.
+    let mut raw_map: HashMap<Vec<u8>, Vec<u32>> = HashMap::new();
+    let mut scanned = 0usize;
+
+    while let Some((covered, batch_map)) = result_rx.recv().await {
+        for (sender, uids) in batch_map {
+            raw_map.entry(sender).or_default().extend(uids);
         }
 
-        completed_batches += 1;
-        let progress = INITIAL_PROGRESS + (1.0 - INITIAL_PROGRESS) * (completed_batches as f32 / num_chunks as f32);
-        progress_cb(progress, format!("Scanned batch {completed_batches}/{num_chunks}"));
+        scanned += covered;
+        let progress =
+            INITIAL_PROGRESS + (1.0 - INITIAL_PROGRESS) * (scanned as f32 / total as f32);
+        progress_cb(progress, format!("Scanned {scanned}/{total} emails"));
+    }
+
+    // Lowercase and decode once per unique sender, merging UID lists
+    // for case variants of the same address.
+    let mut sender_uids: HashMap<String, Vec<u32>> = HashMap::with_capacity(raw_map.len());
+    for (raw, uids) in raw_map {
+        let mut email = String::from_utf8_lossy(&raw).into_owned();
+        email.make_ascii_lowercase();
+        sender_uids.entry(email).or_default().extend(uids);
     }
 
-    let mut senders: Vec<SenderInfo> = sender_map
-        .into_iter()
-        .map(|(email, count)| SenderInfo { email, count })
+    let mut senders: Vec<SenderInfo> = sender_uids
+        .iter()
+        .map(|(email, uids)| SenderInfo {
+            email: email.clone(),
+            count: uids.len(),
+        })
         .collect();
 
     senders.sort_by(|a, b| b.count.cmp(&a.count));
-    Ok(senders)
+    Ok((senders, sender_uids))
 }
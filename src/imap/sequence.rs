@@ -0,0 +1,55 @@
+/// Soft cap on the length of one sequence-set string. RFC 2683
+/// recommends keeping complete command lines under ~1000 octets and
+/// some servers actively enforce it; 900 leaves headroom for the
+/// command verb, flags and destination folder around the set.
+const MAX_SET_LEN: usize = 900;
+
+/// Compresses sorted UIDs into IMAP sequence-set strings, collapsing
+/// consecutive runs into ranges (`12:48,50,52:60`) and starting a new
+/// string whenever the current one would blow the line-length budget.
+///
+/// `uids` must be sorted ascending; duplicates are dropped. Mostly
+/// contiguous mailboxes compress thousands of UIDs into a handful of
+/// ranges, so a purge that previously needed ten comma-joined commands
+/// typically needs one.
+pub fn build_sequence_sets(uids: &[u32]) -> Vec<String> {
+    let mut sets: Vec<String> = Vec::new();
+    let mut current = String::new();
+
+    let push_run = |current: &mut String, sets: &mut Vec<String>, start: u32, end: u32| {
+        let run = if start == end {
+            start.to_string()
+        } else {
+            format!("{start}:{end}")
+        };
+        if !current.is_empty() && current.len() + 1 + run.len() > MAX_SET_LEN {
+            sets.push(std::mem::take(current));
+        }
+        if !current.is_empty() {
+            current.push(',');
+        }
+        current.push_str(&run);
+    };
+
+    let mut iter = uids.iter().copied();
+    let Some(first) = iter.next() else {
+        return sets;
+    };
+    let (mut start, mut end) = (first, first);
+
+    for uid in iter {
+        if uid == end || uid == end + 1 {
+            end = uid;
+        } else {
+            push_run(&mut current, &mut sets, start, end);
+            start = uid;
+            end = uid;
+        }
+    }
+    push_run(&mut current, &mut sets, start, end);
+
+    if !current.is_empty() {
+        sets.push(current);
+    }
+    sets
+}
@@ -33,6 +33,9 @@ pub struct AppState {
     // State
     pub phase: AppPhase,
     pub delete_mode: DeleteMode,
+    /// Delete only messages seen by the scan, using their cached UIDs
+    /// instead of a server-side search.
+    pub nuke_scanned_only: bool,
 
     // Progress
     pub scan_progress: f32,
@@ -43,7 +46,15 @@ pub struct AppState {
     // Results
     pub total_emails: usize,
     pub senders: Vec<SenderInfo>,
+    /// UIDs recorded per sender during the scan; lets a delete skip the
+    /// server-side SEARCH when restricted to scanned messages.
+    pub sender_uids: HashMap<String, Vec<u32>>,
     pub sender_selected: HashMap<String, bool>,
+    /// Running sum of `count` over selected senders, updated on each
+    /// checkbox toggle so the selection summary doesn't re-walk every
+    /// sender per frame.
+    pub selected_emails: usize,
+    pub kill_list_filter: String,
 
     // Errors
     pub error_message: Option<String>,
@@ -58,13 +69,17 @@ impl Default for AppState {
             scan_depth: 0,
             phase: AppPhase::Idle,
             delete_mode: DeleteMode::Trash,
+            nuke_scanned_only: false,
             scan_progress: 0.0,
             scan_status: String::new(),
             delete_progress: 0.0,
             delete_status: String::new(),
             total_emails: 0,
             senders: Vec::new(),
+            sender_uids: HashMap::new(),
             sender_selected: HashMap::new(),
+            selected_emails: 0,
+            kill_list_filter: String::new(),
             error_message: None,
         }
     }
@@ -105,26 +105,52 @@ fn draw_kill_list(
     cmd_tx: &UnboundedSender<UiCommand>,
     busy: bool,
 ) {
-    let top_senders: Vec<(String, usize)> = state
-        .senders
-        .iter()
-        .take(KILL_LIST_LIMIT)
-        .map(|s| (s.email.clone(), s.count))
-        .collect();
+    ui.horizontal(|ui| {
+        ui.label("Filter");
+        ui.add(
+            egui::TextEdit::singleline(&mut state.kill_list_filter).hint_text("sender contains..."),
+        );
+    });
+
+    // Sender addresses are normalized to lowercase during the scan, so
+    // the per-frame filter only lowercases the needle — never the rows.
+    let needle = state.kill_list_filter.trim().to_lowercase();
+
+    // Borrow the sender column and the selection map separately so the
+    // list renders straight from state — no per-repaint clone of the
+    // top rows.
+    let senders = &state.senders;
+    let selected_map = &mut state.sender_selected;
+    let selected_emails = &mut state.selected_emails;
 
     egui::ScrollArea::vertical()
         .max_height(250.0)
         .show(ui, |ui| {
-            for (email, count) in &top_senders {
-                let checked = state.sender_selected.entry(email.clone()).or_insert(false);
+            for sender in senders
+                .iter()
+                .filter(|s| needle.is_empty() || s.email.contains(&needle))
+                .take(KILL_LIST_LIMIT)
+            {
+                if !selected_map.contains_key(&sender.email) {
+                    selected_map.insert(sender.email.clone(), false);
+                }
+                let checked = selected_map
+                    .get_mut(&sender.email)
+                    .expect("selection entry inserted above");
                 ui.horizontal(|ui| {
-                    ui.checkbox(checked, "");
-                    ui.label(format!("{email} ({count})"));
+                    if ui.checkbox(checked, "").changed() {
+                        if *checked {
+                            *selected_emails += sender.count;
+                        } else {
+                            *selected_emails = selected_emails.saturating_sub(sender.count);
+                        }
+                    }
+                    ui.label(format!("{} ({})", sender.email, sender.count));
                 });
             }
         });
 
-    let selected_count = state.selected_email_count();
+    let selected_count = state.selected_emails;
     if selected_count > 0 {
         ui.add_space(4.0);
         ui.colored_label(
@@ -143,6 +169,19 @@ fn draw_kill_list(
                 .map(|s| s.email.clone())
                 .collect();
 
+            let cached_uids = if state.nuke_scanned_only {
+                Some(
+                    selected
+                        .iter()
+                        .filter_map(|s| state.sender_uids.get(s))
+                        .flatten()
+                        .copied()
+                        .collect::<Vec<u32>>(),
+                )
+            } else {
+                None
+            };
+
             state.phase = AppPhase::Deleting;
             state.delete_progress = 0.0;
             state.delete_status = "Starting deletion...".to_string();
@@ -154,6 +193,7 @@ fn draw_kill_list(
                 folder: state.folder.clone(),
                 senders: selected,
                 mode: state.delete_mode.clone(),
+                cached_uids,
             }) {
                 tracing::warn!(error = %e, "failed to send delete command");
             }
@@ -47,7 +47,9 @@ pub fn draw_sidebar(ui: &mut Ui, state: &mut AppState, cmd_tx: &UnboundedSender<
         state.scan_status = "Starting...".to_string();
         state.error_message = None;
         state.senders.clear();
+        state.sender_uids.clear();
         state.sender_selected.clear();
+        state.selected_emails = 0;
 
         let _ = cmd_tx.send(UiCommand::StartScan {
             email: state.email.clone(),
@@ -68,4 +70,11 @@ pub fn draw_sidebar(ui: &mut Ui, state: &mut AppState, cmd_tx: &UnboundedSender<
         DeleteMode::Permanent,
         "Permanently Delete",
     );
+
+    ui.add_space(4.0);
+    ui.checkbox(&mut state.nuke_scanned_only, "Scanned messages only")
+        .on_hover_text(
+            "Delete only the messages this scan saw, using their cached IDs. \
+             Skips the server-side search but won't touch mail outside the scan depth.",
+        );
 }